@@ -0,0 +1,326 @@
+import json
+import os
+import threading
+
+from backend.file_handler import FileHandler
+
+# Special keys that produce text when typed
+SPECIAL_KEY_TEXT = {
+    'Key.space': ' ',
+    'Key.enter': '\n',
+    'Key.tab': '\t',
+}
+
+SHIFT_KEYS = ('Key.shift', 'Key.shift_l', 'Key.shift_r')
+CTRL_KEYS = ('Key.ctrl', 'Key.ctrl_l', 'Key.ctrl_r')
+ALT_KEYS = ('Key.alt', 'Key.alt_l', 'Key.alt_r')
+CMD_KEYS = ('Key.cmd', 'Key.cmd_l', 'Key.cmd_r')
+MODIFIER_KEYS = CTRL_KEYS + ALT_KEYS + CMD_KEYS + ('Key.alt_gr',)
+
+
+def fold_case(text):
+    """
+    Lower-cases text one character at a time, keeping any character whose
+    lower-case form is longer (e.g. 'İ'), so offsets into the result match
+    offsets into the original text.
+    """
+    folded = []
+    for char in text:
+        lowered = char.lower()
+        folded.append(lowered if len(lowered) == 1 else char)
+    return ''.join(folded)
+
+
+class RecordingIndexer:
+    """
+    Inverted index over the text typed in every recording of a directory.
+
+    Each recording's press/release stream is replayed into plain text. The
+    case-folded text (see fold_case) is split into n-grams which map to the recordings and
+    offsets they occur at, so substring searches only verify a handful of
+    candidate positions instead of loading every file.
+
+    refresh() may run on a worker thread (see refresh_async); files are
+    parsed outside the lock so searches stay responsive meanwhile.
+    """
+    VERSION = 2
+    NGRAM = 3
+
+    def __init__(self, recordings_dir, index_file):
+        self.recordings_dir = recordings_dir
+        self.index_file = index_file
+        # filename -> {"mtime", "size", "text", "times", "indices"}
+        self.files = {}
+        # n-gram -> {filename: [offsets]}
+        self.grams = {}
+        self.lock = threading.Lock()
+        self.is_refreshing = False
+        self.refresh_again = False
+        self.load()
+
+    @staticmethod
+    def reconstruct_text(events):
+        """
+        Rebuilds the typed text from a list of recorded events.
+        Returns (text, times, indices) where times[i] and indices[i] are the
+        timestamp and event index of the keypress that produced text[i].
+        """
+        chars = []
+        times = []
+        indices = []
+        shift_down = set()
+        modifiers_down = set()
+        caps_lock = False
+
+        for i, event in enumerate(events):
+            key_code = event.get('key_code')
+            key_char = event.get('key_char')
+
+            if event.get('action') == 'release':
+                shift_down.discard(key_code)
+                modifiers_down.discard(key_code)
+                continue
+
+            if key_code in SHIFT_KEYS:
+                shift_down.add(key_code)
+                continue
+            if key_code in MODIFIER_KEYS:
+                modifiers_down.add(key_code)
+                continue
+            if key_code == 'Key.caps_lock':
+                caps_lock = not caps_lock
+                continue
+            if key_code == 'Key.backspace':
+                if chars:
+                    chars.pop()
+                    times.pop()
+                    indices.pop()
+                continue
+
+            # Shortcuts (ctrl+c etc.) do not type anything. AltGr does: it
+            # types @, €, { and friends on most non-US layouts, and Windows
+            # reports it as ctrl plus alt(_gr)
+            if modifiers_down:
+                altgr = 'Key.alt_gr' in modifiers_down or (
+                    any(key in modifiers_down for key in CTRL_KEYS)
+                    and any(key in modifiers_down for key in ALT_KEYS))
+                if not altgr or any(key in modifiers_down for key in CMD_KEYS):
+                    continue
+                if not key_char:
+                    continue
+
+            if key_char:
+                if not key_char.isprintable():
+                    continue
+                char = key_char
+                # pynput usually reports the shifted character already; only
+                # fix up letters that came through unshifted
+                if char.isalpha() and bool(shift_down) != caps_lock and len(char.upper()) == 1:
+                    char = char.upper()
+            elif key_code in SPECIAL_KEY_TEXT:
+                char = SPECIAL_KEY_TEXT[key_code]
+            else:
+                continue
+
+            chars.append(char)
+            times.append(event.get('time', 0))
+            indices.append(i)
+
+        return ''.join(chars), times, indices
+
+    def load(self):
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION or data.get("ngram") != self.NGRAM:
+                return
+            self.files = data.get("files", {})
+            self.grams = data.get("grams", {})
+        except Exception as e:
+            print(f"Error loading search index: {e}")
+            self.files = {}
+            self.grams = {}
+
+    def save(self):
+        # Copy under the lock (entries are replaced, never mutated, but
+        # posting lists are) and do the slow encoding and writing without it
+        with self.lock:
+            data = {
+                "version": self.VERSION,
+                "ngram": self.NGRAM,
+                "files": dict(self.files),
+                "grams": {gram: {filename: list(offsets) for filename, offsets in postings.items()}
+                          for gram, postings in self.grams.items()}
+            }
+        # Write to a temporary file first so a crash mid-write keeps the old index
+        temp_file = self.index_file + '.tmp'
+        try:
+            with open(temp_file, 'w') as f:
+                json.dump(data, f, indent=None)
+            os.replace(temp_file, self.index_file)
+        except Exception as e:
+            print(f"Error saving search index: {e}")
+
+    def refresh_async(self, on_done=None):
+        """
+        Runs refresh() on a background thread. A request made while one is
+        already running triggers another pass once it finishes.
+        on_done is called from the worker thread when the index is current.
+        """
+        with self.lock:
+            if self.is_refreshing:
+                self.refresh_again = True
+                return
+            self.is_refreshing = True
+
+        def worker():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing search index: {e}")
+                with self.lock:
+                    if not self.refresh_again:
+                        self.is_refreshing = False
+                        break
+                    self.refresh_again = False
+            if on_done:
+                on_done()
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def refresh(self):
+        """
+        Brings the index up to date with the recordings directory, only
+        re-reading files whose size or modification time changed.
+        Returns True if anything changed.
+        """
+        current = {}
+        if os.path.exists(self.recordings_dir):
+            for filename in os.listdir(self.recordings_dir):
+                if not filename.endswith('.rsmk'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.recordings_dir, filename))
+                except OSError:
+                    continue
+                current[filename] = (stat.st_mtime, stat.st_size)
+
+        changed = False
+        with self.lock:
+            for filename in list(self.files):
+                if filename not in current:
+                    self._remove(filename)
+                    changed = True
+            stale = [filename for filename, (mtime, size) in current.items()
+                     if filename not in self.files
+                     or self.files[filename]["mtime"] != mtime
+                     or self.files[filename]["size"] != size]
+
+        for filename in stale:
+            mtime, size = current[filename]
+            try:
+                events = FileHandler.load_recording(os.path.join(self.recordings_dir, filename))
+            except Exception as e:
+                print(f"Error indexing {filename}: {e}")
+                continue
+            text, times, indices = self.reconstruct_text(events)
+            with self.lock:
+                self._remove(filename)
+                self._add(filename, {
+                    "mtime": mtime,
+                    "size": size,
+                    "text": text,
+                    "times": times,
+                    "indices": indices
+                })
+            changed = True
+
+        if changed:
+            self.save()
+        return changed
+
+    def _add(self, filename, entry):
+        # Called with the lock held
+        self.files[filename] = entry
+        lowered = fold_case(entry["text"])
+        for offset in range(len(lowered) - self.NGRAM + 1):
+            gram = lowered[offset:offset + self.NGRAM]
+            self.grams.setdefault(gram, {}).setdefault(filename, []).append(offset)
+
+    def _remove(self, filename):
+        # Called with the lock held
+        entry = self.files.pop(filename, None)
+        if not entry:
+            return
+        lowered = fold_case(entry["text"])
+        for offset in range(len(lowered) - self.NGRAM + 1):
+            gram = lowered[offset:offset + self.NGRAM]
+            postings = self.grams.get(gram)
+            if postings is None:
+                continue
+            postings.pop(filename, None)
+            if not postings:
+                del self.grams[gram]
+
+    def search(self, query, limit=100):
+        """
+        Case-insensitive substring search over all indexed recordings.
+        Returns a list of matches, each a dict with filename, offset,
+        event_index, time and a short context snippet.
+        """
+        query = fold_case(query)
+        if not query:
+            return []
+        with self.lock:
+            return self._search(query, limit)
+
+    def _search(self, query, limit):
+        results = []
+        if len(query) < self.NGRAM:
+            # Too short for the n-gram index, scan the stored text instead
+            for filename in sorted(self.files):
+                lowered = fold_case(self.files[filename]["text"])
+                offset = lowered.find(query)
+                while offset != -1:
+                    results.append(self._make_match(filename, offset, len(query)))
+                    if len(results) >= limit:
+                        return results
+                    offset = lowered.find(query, offset + 1)
+            return results
+
+        query_grams = {query[i:i + self.NGRAM] for i in range(len(query) - self.NGRAM + 1)}
+        candidates = None
+        for gram in query_grams:
+            postings = self.grams.get(gram)
+            if not postings:
+                return []
+            names = set(postings)
+            candidates = names if candidates is None else candidates & names
+            if not candidates:
+                return []
+
+        first_gram = query[:self.NGRAM]
+        for filename in sorted(candidates):
+            lowered = fold_case(self.files[filename]["text"])
+            for offset in self.grams[first_gram][filename]:
+                if lowered.startswith(query, offset):
+                    results.append(self._make_match(filename, offset, len(query)))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def _make_match(self, filename, offset, length):
+        entry = self.files[filename]
+        text = entry["text"]
+        start = max(0, offset - 15)
+        end = min(len(text), offset + length + 15)
+        return {
+            "filename": filename,
+            "offset": offset,
+            "event_index": entry["indices"][offset],
+            "time": entry["times"][offset],
+            "context": text[start:end].replace('\n', ' ').replace('\t', ' ')
+        }
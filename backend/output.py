@@ -0,0 +1,226 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+def event_key(event):
+    """Identity of the key an event refers to, used to pair presses and releases."""
+    return (event.get('vk'), event.get('key_code'), event.get('key_char'))
+
+
+class OutputBackend(ABC):
+    """
+    Destination for played-back events.
+
+    The Player calls begin() once before the first event, send() with every
+    batch of events that fall due at the same instant, send_cleanup() with
+    releases for keys still held when playback stops, and end() when
+    playback finishes or is stopped.
+    """
+    def begin(self):
+        pass
+
+    @abstractmethod
+    def send(self, events):
+        pass
+
+    def send_cleanup(self, events):
+        """Releases synthesized by the Player, not part of the recording."""
+        self.send(events)
+
+    def end(self):
+        pass
+
+
+class PynputBackend(OutputBackend):
+    """Injects events into the OS through pynput's keyboard Controller."""
+    def __init__(self):
+        # Imported here so the other backends work without pynput installed
+        from pynput import keyboard
+        self.keyboard = keyboard
+        self.controller = keyboard.Controller()
+        # Resolved pynput keys, keyed by event_key()
+        self.key_cache = {}
+
+    def send(self, events):
+        for event in events:
+            identity = event_key(event)
+            if identity in self.key_cache:
+                key = self.key_cache[identity]
+            else:
+                key = self.key_cache[identity] = self._resolve_key(event)
+            if key is None:
+                continue
+            if event['action'] == 'press':
+                self.controller.press(key)
+            elif event['action'] == 'release':
+                self.controller.release(key)
+
+    def _resolve_key(self, event):
+        # 1. Try KeyCode by vk (Virtual Key)
+        if event.get('vk'):
+            return self.keyboard.KeyCode.from_vk(event['vk'])
+
+        # 2. Try Special Key Code
+        if event['key_code']:
+            key_name = event['key_code'].replace('Key.', '')
+            if hasattr(self.keyboard.Key, key_name):
+                return getattr(self.keyboard.Key, key_name)
+
+        # 3. Try Character
+        if event['key_char']:
+            return event['key_char']
+
+        return None
+
+
+class MemoryBackend(OutputBackend):
+    """
+    Keeps every injected event in memory together with the time (seconds
+    since begin()) it was sent. Used for headless verification and benchmarks.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.injected = []
+        # Cleanup releases are kept apart so they never count as played events
+        self.cleanup = []
+        self.batches = 0
+        self.start_time = None
+
+    def begin(self):
+        with self.lock:
+            self.injected = []
+            self.cleanup = []
+            self.batches = 0
+            self.start_time = time.perf_counter()
+
+    def send(self, events):
+        now = time.perf_counter() - self.start_time
+        with self.lock:
+            self.batches += 1
+            for event in events:
+                self.injected.append((now, event))
+
+    def send_cleanup(self, events):
+        now = time.perf_counter() - self.start_time
+        with self.lock:
+            for event in events:
+                self.cleanup.append((now, event))
+
+    def get_injected(self):
+        with self.lock:
+            return list(self.injected)
+
+    def get_cleanup(self):
+        with self.lock:
+            return list(self.cleanup)
+
+
+class StreamBackend(OutputBackend):
+    """
+    Streams events as JSON lines to a file, FIFO or any writable file object
+    (e.g. a subprocess stdin). Each line is the recorded event plus
+    "sent_at", the seconds since playback began. Cleanup releases also
+    carry "cleanup": true.
+    """
+    def __init__(self, target):
+        self.target = target
+        self.stream = None
+        self.owns_stream = False
+        self.start_time = None
+
+    def begin(self):
+        if isinstance(self.target, str):
+            self.stream = open(self.target, 'a')
+            self.owns_stream = True
+        else:
+            self.stream = self.target
+            self.owns_stream = False
+        self.start_time = time.perf_counter()
+
+    def send(self, events):
+        self._write(events, {})
+
+    def send_cleanup(self, events):
+        self._write(events, {'cleanup': True})
+
+    def _write(self, events, extra):
+        now = time.perf_counter() - self.start_time
+        lines = []
+        for event in events:
+            record = dict(event)
+            record['sent_at'] = now
+            record.update(extra)
+            lines.append(json.dumps(record) + '\n')
+        # One write and flush per batch keeps the consumer in sync
+        self.stream.write(''.join(lines))
+        self.stream.flush()
+
+    def end(self):
+        if self.stream and self.owns_stream:
+            self.stream.close()
+        self.stream = None
+
+
+def fidelity_report(source_events, injected, speed_factor=1.0):
+    """
+    Compares what a backend received against the source recording.
+
+    injected: list of (sent_time, event) as kept by MemoryBackend, without
+    cleanup releases. Ordering is checked position by position up to the
+    first mismatch. Timing is measured by pairing each injected event with
+    the source event of the same action and key at the same occurrence
+    count, so a dropped event does not shift every later measurement.
+    All timing errors are absolute seconds from the event's scheduled time
+    at the given speed; "mean_lateness" is the signed average (positive
+    means late).
+    """
+    speed = max(0.1, speed_factor)
+    expected = [(event['action'], event_key(event)) for event in source_events]
+    received = [(event['action'], event_key(event)) for _, event in injected]
+
+    first_mismatch = None
+    for i, (want, got) in enumerate(zip(expected, received)):
+        if want != got:
+            first_mismatch = i
+            break
+    if first_mismatch is None and len(expected) != len(received):
+        first_mismatch = min(len(expected), len(received))
+
+    # (action, key, occurrence) -> scheduled time
+    scheduled = {}
+    seen = {}
+    for identity, event in zip(expected, source_events):
+        n = seen.get(identity, 0)
+        seen[identity] = n + 1
+        scheduled[(identity, n)] = event['time'] / speed
+
+    errors = []
+    seen = {}
+    for identity, (sent_time, _) in zip(received, injected):
+        n = seen.get(identity, 0)
+        seen[identity] = n + 1
+        when = scheduled.pop((identity, n), None)
+        if when is not None:
+            errors.append(sent_time - when)
+
+    report = {
+        "expected": len(expected),
+        "injected": len(received),
+        "in_order": first_mismatch is None,
+        "first_mismatch": first_mismatch,
+        "missing": len(scheduled),
+        "extra": len(received) - len(errors),
+        "mean_lateness": 0.0,
+        "mean_error": 0.0,
+        "max_error": 0.0,
+        "p95_error": 0.0
+    }
+    if errors:
+        abs_errors = sorted(abs(e) for e in errors)
+        report["mean_lateness"] = sum(errors) / len(errors)
+        report["mean_error"] = sum(abs_errors) / len(abs_errors)
+        report["max_error"] = abs_errors[-1]
+        report["p95_error"] = abs_errors[min(len(abs_errors) - 1, int(len(abs_errors) * 0.95))]
+    return report
@@ -1,98 +1,229 @@
 import time
 import threading
-from pynput import keyboard
-from pynput.keyboard import Key, Controller
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.output import event_key
+from backend.stats import PlaybackStats, EMPTY_PLAYBACK_STATS
+
+
+# Events due within this many seconds of each other are sent as one batch
+BATCH_WINDOW = 0.002
+
+
+def prepare_events(events, speed_factor=1.0):
+    """
+    Groups events into (offset, batch) pairs ready for playback, where offset
+    is the seconds after playback start (already scaled by speed) and batch
+    holds the events due within BATCH_WINDOW of that offset.
+    """
+    speed = max(0.1, speed_factor)
+    batches = []
+    for event in events:
+        offset = event['time'] / speed
+        if batches and offset - batches[-1][0] <= BATCH_WINDOW:
+            batches[-1][1].append(event)
+        else:
+            batches.append((offset, [event]))
+    return batches
+
+
+def events_from(events, start_index):
+    """
+    Returns the events from start_index on, rebased so playback starts
+    immediately. Keys still held at that point (e.g. shift) are pressed
+    first so the remaining events behave as they did in the recording.
+    """
+    if start_index <= 0:
+        return list(events)
+    held = {}
+    for event in events[:start_index]:
+        if event['action'] == 'press':
+            held[event_key(event)] = event
+        elif event['action'] == 'release':
+            held.pop(event_key(event), None)
+
+    base = events[start_index]['time'] if start_index < len(events) else 0
+    rebased = [dict(event, time=0.0) for event in held.values()]
+    rebased.extend(dict(event, time=event['time'] - base) for event in events[start_index:])
+    return rebased
+
 
 class Player:
-    def __init__(self):
-        self.controller = Controller()
+    def __init__(self, backend=None):
+        if backend is None:
+            from backend.output import PynputBackend
+            backend = PynputBackend()
+        self.backend = backend
         self.is_playing = False
         self.stop_flag = False
+        self.stop_event = threading.Event()
         self.thread = None
+        self.stats = EMPTY_PLAYBACK_STATS
 
     def start_playback(self, events, speed_factor=1.0, on_finished=None):
+        """Returns False without doing anything if playback is already running."""
         if self.is_playing:
-            return
+            return False
 
         self.is_playing = True
         self.stop_flag = False
-        self.thread = threading.Thread(target=self._play_loop, args=(events, speed_factor, on_finished))
+        self.stop_event.clear()
+        segments = [(prepare_events(events, speed_factor), 0.0)]
+        self.thread = threading.Thread(target=self._play_loop, args=(segments, 1, on_finished))
         self.thread.daemon = True
         self.thread.start()
+        return True
 
     def stop_playback(self):
         self.stop_flag = True
+        self.stop_event.set()
 
-    def _play_loop(self, events, speed_factor, on_finished):
-        if not events:
-            self.is_playing = False
-            if on_finished:
-                on_finished()
-            return
+    def get_stats(self):
+        """Latest PlaybackStats snapshot; safe to call from any thread."""
+        return self.stats
+
+    def start_playlist(self, entries, loader, on_finished=None):
+        """
+        Plays several recordings back to back on one clock.
+
+        entries: list of dicts with 'source' (passed to loader), and optional
+                 'repeat' (times to play), 'speed' and 'gap' (seconds of
+                 silence after each run of the entry).
+        loader: callable returning the event list for an entry's source.
+        The next entry is loaded and prepared in the background while the
+        current one plays, so transitions land exactly after the gap.
+        Returns False without doing anything if playback is already running.
+        """
+        if self.is_playing:
+            return False
+
+        self.is_playing = True
+        self.stop_flag = False
+        self.stop_event.clear()
+        segments = self._playlist_segments(entries, loader)
+        # Later entries are not loaded yet, so only the run count is known upfront
+        runs = sum(max(1, int(entry.get('repeat', 1))) for entry in entries)
+        self.thread = threading.Thread(target=self._play_loop, args=(segments, runs, on_finished))
+        self.thread.daemon = True
+        self.thread.start()
+        return True
+
+    def _playlist_segments(self, entries, loader):
+        def prepare(entry):
+            return prepare_events(loader(entry['source']), entry.get('speed', 1.0))
 
-        start_time = time.time()
-        last_event_time = 0
-        
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            future = executor.submit(prepare, entries[0]) if entries else None
+            for index, entry in enumerate(entries):
+                try:
+                    batches = future.result()
+                except Exception as e:
+                    print(f"Error loading playlist entry {entry['source']}: {e}")
+                    batches = None
+                # Prefetch the next entry while this one plays
+                if index + 1 < len(entries):
+                    future = executor.submit(prepare, entries[index + 1])
+                if batches is None:
+                    continue
+                for _ in range(max(1, int(entry.get('repeat', 1)))):
+                    yield batches, entry.get('gap', 0.0)
+        finally:
+            executor.shutdown(wait=False)
+
+    def _play_loop(self, segments, runs, on_finished):
         # Track pressed keys to release them forcefully if stopped
-        pressed_keys = set()
-        
+        pressed_keys = {}
+
+        stopped = False
+        self.stats = EMPTY_PLAYBACK_STATS._replace(runs=runs)
+
         try:
-            for event in events:
+            self.backend.begin()
+            # Events are scheduled against one absolute clock so sleep overshoot
+            # does not accumulate over long recordings or across playlist entries
+            segment_start = time.perf_counter()
+            playback_start = segment_start
+
+            for run, (batches, gap) in enumerate(segments):
                 if self.stop_flag:
                     break
-                    
-                event_time = event['time']
-                
-                # Calculate time to wait
-                time_diff = event_time - last_event_time
-                delay = time_diff / max(0.1, speed_factor)
-                
-                if delay > 0:
-                    time.sleep(delay)
-                    
-                last_event_time = event_time
-                
-                # Execute key
-                key = self._resolve_key(event)
-                if key is not None:
-                    if event['action'] == 'press':
-                        self.controller.press(key)
-                        pressed_keys.add(key)
-                    elif event['action'] == 'release':
-                        self.controller.release(key)
-                        if key in pressed_keys:
-                            pressed_keys.remove(key)
-                            
+                # If preparing this segment ran late, start it now rather
+                # than rushing through the events that are already overdue
+                segment_start = max(segment_start, time.perf_counter())
+
+                total = sum(len(batch) for _, batch in batches)
+                duration = batches[-1][0] if batches else 0.0
+                sent = 0
+                max_lateness = self.stats.max_lateness
+
+                i = 0
+                while i < len(batches):
+                    if self.stop_flag:
+                        stopped = True
+                        break
+
+                    offset, batch = batches[i]
+                    i += 1
+
+                    delay = segment_start + offset - time.perf_counter()
+                    if delay > 0:
+                        # Wake up early if playback is stopped mid-wait
+                        if self.stop_event.wait(delay):
+                            stopped = True
+                            break
+
+                    sent_at = time.perf_counter()
+                    # Anything else already due (e.g. after a late wake-up)
+                    # goes out in the same batch instead of one call each
+                    due = sent_at - segment_start
+                    if i < len(batches) and batches[i][0] <= due:
+                        batch = list(batch)
+                        while i < len(batches) and batches[i][0] <= due:
+                            batch.extend(batches[i][1])
+                            i += 1
+                    self.backend.send(batch)
+
+                    # Publish a fresh snapshot; rebinding is atomic so readers need no lock
+                    sent += len(batch)
+                    lateness = sent_at - segment_start - offset
+                    if lateness > max_lateness:
+                        max_lateness = lateness
+                    self.stats = PlaybackStats(run, runs, sent, total, sent_at - playback_start,
+                                               lateness, max_lateness, duration - batches[i - 1][0])
+
+                    for event in batch:
+                        if event['action'] == 'press':
+                            pressed_keys[event_key(event)] = event
+                        elif event['action'] == 'release':
+                            pressed_keys.pop(event_key(event), None)
+
+                if stopped:
+                    break
+                if batches:
+                    segment_start += batches[-1][0]
+                segment_start += gap
+
         except Exception as e:
             print(f"Error during playback: {e}")
         finally:
+            # Shut down any playlist prefetch still in flight
+            close = getattr(segments, 'close', None)
+            if close:
+                close()
+
             # Cleanup: Release any keys that are still pressed
-            for key in pressed_keys:
+            if pressed_keys:
+                releases = [dict(event, action='release') for event in pressed_keys.values()]
                 try:
-                    self.controller.release(key)
-                except:
+                    self.backend.send_cleanup(releases)
+                except Exception:
                     pass
-            
+            try:
+                self.backend.end()
+            except Exception as e:
+                print(f"Error closing output backend: {e}")
+
             self.is_playing = False
             if on_finished:
                 on_finished()
-
-    def _execute_key(self, event):
-        pass
-
-    def _resolve_key(self, event):
-        # 1. Try KeyCode by vk (Virtual Key)
-        if event.get('vk'):
-            return keyboard.KeyCode.from_vk(event['vk'])
-
-        # 2. Try Special Key Code
-        if event['key_code']:
-            key_name = event['key_code'].replace('Key.', '')
-            if hasattr(Key, key_name):
-                return getattr(Key, key_name)
-        
-        # 3. Try Character
-        if event['key_char']:
-            return event['key_char']
-            
-        return None
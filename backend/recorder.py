@@ -2,10 +2,13 @@ import time
 import threading
 from pynput import keyboard
 
+from backend.stats import RecordingStats
+
 class Recorder:
     def __init__(self):
         self.events = []
         self.start_time = 0
+        self.stop_time = 0
         self.is_recording = False
         self.listener = None
         
@@ -27,6 +30,7 @@ class Recorder:
             return
             
         self.is_recording = False
+        self.stop_time = time.time()
         if self.listener:
             self.listener.stop()
             self.listener = None
@@ -89,3 +93,10 @@ class Recorder:
             
     def get_events(self):
         return self.events
+
+    def get_stats(self):
+        """Snapshot of the recording in progress; safe to call from any thread."""
+        if not self.is_recording:
+            # Keep reporting the length of the finished recording
+            return RecordingStats(len(self.events), self.stop_time - self.start_time)
+        return RecordingStats(len(self.events), time.time() - self.start_time)
@@ -0,0 +1,337 @@
+import datetime
+import heapq
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+from backend.file_handler import FileHandler
+
+POLICIES = ('queue', 'skip', 'preempt')
+KINDS = ('interval', 'daily')
+
+
+class Scheduler:
+    """
+    Runs recordings at fixed intervals or daily times.
+
+    All jobs live in one min-heap keyed by fire time and are serviced by a
+    single thread that sleeps until the earliest entry is due, so thousands
+    of jobs cost no extra threads or polling. Each job gets a preload entry
+    shortly before it fires so its recording is already parsed when due.
+    Parsed recordings are cached per file and modification time, so jobs
+    firing often do not re-read an unchanged file.
+
+    Jobs are plain dicts:
+        id, filename, kind ('interval' or 'daily'), interval (seconds),
+        at ('HH:MM'), speed, policy ('queue', 'skip' or 'preempt'), enabled
+    """
+    PRELOAD_SECONDS = 5.0
+    # Re-check the wall clock at least this often so clock changes are noticed
+    MAX_WAIT = 60.0
+
+    def __init__(self, player, recordings_dir, schedule_file,
+                 on_job_start=None, on_job_finished=None, is_busy=None, clock=time.time):
+        self.player = player
+        self.recordings_dir = recordings_dir
+        self.schedule_file = schedule_file
+        self.on_job_start = on_job_start
+        self.on_job_finished = on_job_finished
+        self.is_busy = is_busy
+        self.clock = clock
+
+        self.cond = threading.Condition()
+        self.jobs = {}
+        self.next_runs = {}
+        self.heap = []
+        self.seq = 0
+        # filename -> (mtime, events)
+        self.preloaded = {}
+        self.pending = deque()
+        self.running = False
+        self.woken = False
+        self.thread = None
+
+        self.load()
+
+    def start(self, threaded=True):
+        """
+        Schedules all jobs and starts the scheduler thread. With
+        threaded=False the caller drives the scheduler by calling tick().
+        """
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+            for job in self.jobs.values():
+                self._schedule(job, self.clock())
+        if threaded:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+
+    def wake(self):
+        """Re-evaluate queued jobs, e.g. after playback or recording ends."""
+        with self.cond:
+            self.woken = True
+            self.cond.notify()
+
+    def load(self):
+        if not os.path.exists(self.schedule_file):
+            return
+        try:
+            with open(self.schedule_file, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading schedule: {e}")
+            return
+        for job in data.get("jobs", []):
+            # Skip hand-edited entries that add_job would have rejected
+            try:
+                self._validate_job(job)
+            except ValueError as e:
+                print(f"Skipping invalid scheduled job {job!r}: {e}")
+                continue
+            job["interval"] = float(job.get("interval", 0))
+            job["speed"] = float(job.get("speed", 1.0))
+            self.jobs[job["id"]] = job
+
+    def save(self):
+        data = {
+            "version": "1.0",
+            "jobs": list(self.jobs.values())
+        }
+        try:
+            with open(self.schedule_file, 'w') as f:
+                json.dump(data, f, indent=4)
+        except Exception as e:
+            print(f"Error saving schedule: {e}")
+
+    def add_job(self, filename, kind='interval', interval=300, at='09:00', speed=1.0, policy='queue'):
+        job = {
+            "id": uuid.uuid4().hex[:8],
+            "filename": filename,
+            "kind": kind,
+            "interval": float(interval),
+            "at": at,
+            "speed": float(speed),
+            "policy": policy,
+            "enabled": True
+        }
+        self._validate_job(job)
+        with self.cond:
+            self.jobs[job["id"]] = job
+            if self.running:
+                self._schedule(job, self.clock())
+                self.woken = True
+                self.cond.notify()
+            self.save()
+        return job
+
+    def remove_job(self, job_id):
+        with self.cond:
+            job = self.jobs.pop(job_id, None)
+            self.next_runs.pop(job_id, None)
+            # A removed job must not start later from the queue either
+            self.pending = deque(item for item in self.pending if item[0]["id"] != job_id)
+            if job and all(other["filename"] != job["filename"] for other in self.jobs.values()):
+                self.preloaded.pop(job["filename"], None)
+            # Heap entries of removed jobs are discarded lazily when popped
+            self.save()
+
+    def get_jobs(self):
+        """Returns (job, next_run) pairs sorted by next run time."""
+        with self.cond:
+            pairs = [(job, self.next_runs.get(job_id)) for job_id, job in self.jobs.items()]
+        return sorted(pairs, key=lambda pair: pair[1] or float('inf'))
+
+    @classmethod
+    def _validate_job(cls, job):
+        if not isinstance(job, dict):
+            raise ValueError("Job must be an object.")
+        for field in ("id", "filename"):
+            if not isinstance(job.get(field), str) or not job[field]:
+                raise ValueError(f"Missing {field}.")
+        if job.get("kind") not in KINDS:
+            raise ValueError(f"Unknown schedule kind: {job.get('kind')}")
+        if job.get("policy", 'queue') not in POLICIES:
+            raise ValueError(f"Unknown overlap policy: {job.get('policy')}")
+        try:
+            interval = float(job.get("interval", 0))
+            float(job.get("speed", 1.0))
+        except (TypeError, ValueError):
+            raise ValueError("Interval and speed must be numbers.")
+        if job["kind"] == 'interval' and interval <= 0:
+            raise ValueError("Interval must be positive.")
+        if job["kind"] == 'daily':
+            cls._parse_time(job.get("at"))
+
+    @staticmethod
+    def _parse_time(at):
+        try:
+            hour, minute = at.split(':')
+            return datetime.time(int(hour), int(minute))
+        except Exception:
+            raise ValueError(f"Invalid time '{at}', expected HH:MM.")
+
+    def _compute_next_run(self, job, now):
+        if job["kind"] == 'interval':
+            previous = self.next_runs.get(job["id"])
+            if previous is None:
+                return now + job["interval"]
+            # Stay aligned to the original grid, skipping missed slots
+            next_run = previous + job["interval"]
+            if next_run <= now:
+                missed = int((now - next_run) // job["interval"]) + 1
+                next_run += missed * job["interval"]
+            return next_run
+
+        at = self._parse_time(job["at"])
+        today = datetime.datetime.fromtimestamp(now).date()
+        candidate = datetime.datetime.combine(today, at).timestamp()
+        if candidate <= now:
+            candidate = datetime.datetime.combine(today + datetime.timedelta(days=1), at).timestamp()
+        return candidate
+
+    def _push(self, when, kind, job_id):
+        self.seq += 1
+        heapq.heappush(self.heap, (when, self.seq, kind, job_id))
+
+    def _schedule(self, job, now):
+        if not job.get("enabled", True):
+            return
+        try:
+            next_run = self._compute_next_run(job, now)
+        except Exception as e:
+            # One broken job must not take down the only scheduler thread
+            print(f"Error scheduling {job.get('filename')}: {e}")
+            self.next_runs.pop(job["id"], None)
+            return
+        self.next_runs[job["id"]] = next_run
+        self._push(max(now, next_run - self.PRELOAD_SECONDS), 'preload', job["id"])
+        self._push(next_run, 'fire', job["id"])
+
+    def _run(self):
+        while True:
+            timeout = self.tick()
+            with self.cond:
+                if not self.running:
+                    return
+                if not self.woken:
+                    self.cond.wait(timeout)
+                self.woken = False
+
+    def tick(self):
+        """
+        Handles every heap entry that is due, then starts the next queued
+        job if the player is free. Returns the seconds until the next entry.
+        """
+        due = []
+        with self.cond:
+            now = self.clock()
+            while self.heap and self.heap[0][0] <= now:
+                when, _, kind, job_id = heapq.heappop(self.heap)
+                # Skip entries of removed or rescheduled jobs
+                if job_id not in self.jobs or self.next_runs.get(job_id) is None:
+                    continue
+                if kind == 'fire' and self.next_runs[job_id] != when:
+                    continue
+                due.append((kind, self.jobs[job_id]))
+                if kind == 'fire':
+                    self._schedule(self.jobs[job_id], now)
+
+        # File loading and preemption happen outside the lock so that
+        # player callbacks calling wake() cannot deadlock against us
+        for kind, job in due:
+            if kind == 'preload':
+                self._preload(job)
+            else:
+                self._fire(job)
+
+        with self.cond:
+            self._start_pending()
+            timeout = self.MAX_WAIT
+            if self.heap:
+                timeout = min(timeout, max(0, self.heap[0][0] - self.clock()))
+            return timeout
+
+    def _load_events(self, job):
+        filepath = os.path.join(self.recordings_dir, job["filename"])
+        try:
+            mtime = os.path.getmtime(filepath)
+            with self.cond:
+                cached = self.preloaded.get(job["filename"])
+            if cached and cached[0] == mtime:
+                return cached[1]
+            events = FileHandler.load_recording(filepath)
+        except Exception as e:
+            print(f"Error loading scheduled recording {job['filename']}: {e}")
+            return None
+        with self.cond:
+            self.preloaded[job["filename"]] = (mtime, events)
+        return events
+
+    def _preload(self, job):
+        self._load_events(job)
+
+    def _busy(self):
+        return self.player.is_playing or bool(self.is_busy and self.is_busy())
+
+    def _fire(self, job):
+        events = self._load_events(job)
+        if not events:
+            return
+
+        if self._busy():
+            policy = job.get("policy", 'queue')
+            if policy == 'skip':
+                return
+            with self.cond:
+                # Queue each job at most once
+                self.pending = deque(item for item in self.pending if item[0]["id"] != job["id"])
+                if policy == 'preempt' and self.player.is_playing:
+                    # Don't wait for the player to wind down here, that would
+                    # hold up every other due job; its finished callback
+                    # wakes the scheduler to start this one next
+                    self.player.stop_playback()
+                    self.pending.appendleft((job, events))
+                else:
+                    self.pending.append((job, events))
+            return
+
+        self._play(job, events)
+
+    def _start_pending(self):
+        # Called with the lock held
+        if self.pending and not self._busy():
+            job, events = self.pending.popleft()
+            self._play(job, events)
+
+    def _play(self, job, events):
+        announced = threading.Event()
+
+        def finished():
+            # Never report the end of a job before its start
+            announced.wait()
+            if self.on_job_finished:
+                self.on_job_finished(job)
+            self.wake()
+
+        # The player may have been started elsewhere since _busy() was checked
+        if not self.player.start_playback(events, speed_factor=job.get("speed", 1.0), on_finished=finished):
+            if job.get("policy", 'queue') == 'skip':
+                print(f"Skipped scheduled recording {job['filename']}: player busy")
+            else:
+                with self.cond:
+                    self.pending.appendleft((job, events))
+            return
+
+        if self.on_job_start:
+            self.on_job_start(job)
+        announced.set()
@@ -0,0 +1,37 @@
+from collections import namedtuple
+
+# Snapshots are immutable tuples. The backend thread publishes a new one by
+# rebinding an attribute, which is atomic, so the GUI can read the latest
+# snapshot at any time without locks and without slowing the backend down.
+
+RecordingStats = namedtuple('RecordingStats', [
+    'events',       # events captured so far
+    'elapsed',      # seconds since recording started
+])
+
+PlaybackStats = namedtuple('PlaybackStats', [
+    'run',          # index of the recording being played (playlists have several)
+    'runs',         # recordings to play in total, counting playlist repeats
+    'index',        # events sent from the current recording
+    'total',        # events in the current recording
+    'elapsed',      # seconds since playback started
+    'lateness',     # seconds the last batch was sent after its scheduled time
+    'max_lateness', # worst lateness seen so far
+    'eta',          # seconds until the current recording finishes
+])
+
+EMPTY_PLAYBACK_STATS = PlaybackStats(0, 1, 0, 0, 0.0, 0.0, 0.0, 0.0)
+
+
+def format_playback(stats):
+    """
+    Returns (fraction, text) for the GUI progress bar and status line, or
+    None before the first event has been sent. The fraction covers every
+    playlist run; the event count and ETA are for the current run.
+    """
+    if not stats.total:
+        return None
+    fraction = (stats.run + stats.index / stats.total) / stats.runs
+    text = (f"Run {stats.run + 1}/{stats.runs} | Event {stats.index}/{stats.total} | "
+            f"Late {stats.lateness*1000:.1f}ms | Run ETA {stats.eta:.1f}s")
+    return fraction, text
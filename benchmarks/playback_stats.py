@@ -0,0 +1,121 @@
+"""
+Measures whether the live stats display affects playback timing.
+
+Plays a synthetic typing recording into a MemoryBackend while the main
+thread runs a real Tk mainloop that redraws the same widgets main.App uses
+(a CTkLabel and a CTkProgressBar, or plain Tk equivalents when
+customtkinter is missing) from the player's stats snapshot:
+
+    none        no Tk at all, playback thread only
+    display     redraws every STATS_POLL_MS, as main.App does
+    every 1ms   redraws every millisecond, to show what an unthrottled
+                display would cost
+
+Prints the fidelity report of each run. The Tk rows need a display (run
+under Xvfb on a headless machine) and are reported as skipped without one.
+
+Usage: python benchmarks/playback_stats.py [keystrokes] [mean_gap_ms]
+"""
+import os
+import random
+import sys
+import threading
+import tkinter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.player import Player
+from backend.output import MemoryBackend, fidelity_report
+from backend.stats import format_playback
+
+# Same rate as main.STATS_POLL_MS (main.py cannot be imported without pynput)
+STATS_POLL_MS = 200
+
+
+def make_events(count, mean_gap):
+    """Typing-like recording with irregular timestamps, as time.time() produces."""
+    rng = random.Random(0)
+    events = []
+    t = 0.0
+    for _ in range(count):
+        char = rng.choice('abcdefghijklmnopqrstuvwxyz ')
+        t += rng.uniform(0.2, 1.8) * mean_gap
+        events.append({'action': 'press', 'time': t, 'key_char': char, 'key_code': None, 'vk': None})
+        t += rng.uniform(0.1, 0.9) * mean_gap
+        events.append({'action': 'release', 'time': t, 'key_char': char, 'key_code': None, 'vk': None})
+    return events
+
+
+def make_display():
+    try:
+        import customtkinter as ctk
+        root = ctk.CTk()
+        label = ctk.CTkLabel(root, text="Events: 0")
+        progress = ctk.CTkProgressBar(root)
+        set_progress = progress.set
+    except ImportError:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+        label = tk.Label(root, text="Events: 0")
+        progress = ttk.Progressbar(root, maximum=1.0)
+        set_progress = lambda value: progress.configure(value=value)
+    label.pack()
+    progress.pack(fill="x")
+    return root, label, set_progress
+
+
+def run(events, poll_ms):
+    backend = MemoryBackend()
+    player = Player(backend)
+    done = threading.Event()
+
+    if poll_ms is None:
+        player.start_playback(events, on_finished=done.set)
+        done.wait()
+        return fidelity_report(events, backend.get_injected()), 0
+
+    try:
+        root, label, set_progress = make_display()
+    except tkinter.TclError as e:
+        return None, str(e)
+    redraws = [0]
+
+    # Same work as main.App.poll_stats does while playing
+    def poll():
+        display = format_playback(player.get_stats())
+        if display:
+            fraction, text = display
+            set_progress(fraction)
+            label.configure(text=text)
+            redraws[0] += 1
+        if done.is_set():
+            root.quit()
+            return
+        root.after(poll_ms, poll)
+
+    root.after(poll_ms, poll)
+    player.start_playback(events, on_finished=done.set)
+    root.mainloop()
+    root.destroy()
+    return fidelity_report(events, backend.get_injected()), redraws[0]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    mean_gap = (float(sys.argv[2]) if len(sys.argv) > 2 else 10.0) / 1000
+    events = make_events(count, mean_gap)
+
+    print(f"{len(events)} events, {events[-1]['time']:.1f}s")
+    print(f"{'display':<12} {'redraws':>8} {'in order':>9} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, poll_ms in (("none", None), ("display", STATS_POLL_MS), ("every 1ms", 1)):
+        report, redraws = run(events, poll_ms)
+        if report is None:
+            print(f"{name:<12} skipped: {redraws}")
+            continue
+        print(f"{name:<12} {redraws:>8} {str(report['in_order']):>9} "
+              f"{report['mean_error']*1000:>9.3f} {report['p95_error']*1000:>9.3f} {report['max_error']*1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,28 @@ import threading
 import os
 import sys
 import json
+import time
 
 # Add current directory to path so we can import backend
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from backend.recorder import Recorder
-from backend.player import Player
+from backend.player import Player, events_from
 from backend.file_handler import FileHandler
 from backend.hotkey_manager import HotkeyManager
+from backend.indexer import RecordingIndexer
+from backend.scheduler import Scheduler, POLICIES
+from backend.stats import format_playback
 
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
+# Values used for playlist entry fields missing from settings.json
+PLAYLIST_DEFAULTS = {"repeat": 1, "speed": 1.0, "gap": 0.0}
+
+# Live stats refresh rate. Kept low so the GUI never competes with playback timing.
+STATS_POLL_MS = 200
+
 def get_user_data_dir():
     """Get the user-writable data directory for this application."""
     # Use Local AppData (e.g., C:\Users\Username\AppData\Local)
@@ -46,7 +56,7 @@ class App(ctk.CTk):
         super().__init__()
 
         self.title("Auto Keyboard Repeater Pro")
-        self.geometry("600x500")
+        self.geometry("600x580")
         self.resizable(False, False)
         
         # Set Icon
@@ -79,7 +89,8 @@ class App(ctk.CTk):
                 'stop_record': '<ctrl>+<f9>',
                 'start_play': '<ctrl>+<f10>',
                 'stop_play': '<ctrl>+<f11>'
-            }
+            },
+            "playlist": []
         }
         self.load_settings()
 
@@ -88,6 +99,7 @@ class App(ctk.CTk):
         self.player = Player()
         self.current_events = []
         self.filename = None
+        self.indexer = RecordingIndexer(self.recordings_dir, os.path.join(self.data_dir, "search_index.json"))
 
         # State
         self.app_state = "IDLE" 
@@ -105,6 +117,9 @@ class App(ctk.CTk):
         self.status_label.pack(pady=10)
         self.event_count_label = ctk.CTkLabel(self.status_frame, text="Events: 0")
         self.event_count_label.pack(pady=5)
+        self.progress_bar = ctk.CTkProgressBar(self.status_frame)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(pady=(0, 10), padx=20, fill="x")
 
         # --- Main Controls ---
         self.control_frame = ctk.CTkFrame(self)
@@ -138,6 +153,15 @@ class App(ctk.CTk):
         self.btn_save = ctk.CTkButton(self.control_frame, text="Save As New", command=self.save_file)
         self.btn_save.grid(row=2, column=0, padx=5, pady=10)
 
+        self.btn_search = ctk.CTkButton(self.control_frame, text="Search Text", command=self.open_search)
+        self.btn_search.grid(row=2, column=1, padx=5, pady=10)
+
+        self.btn_schedule = ctk.CTkButton(self.control_frame, text="Schedules", command=self.open_schedules)
+        self.btn_schedule.grid(row=2, column=2, padx=5, pady=10)
+
+        self.btn_playlist = ctk.CTkButton(self.control_frame, text="Playlist", command=self.open_playlist)
+        self.btn_playlist.grid(row=3, column=1, padx=5, pady=10)
+
         # --- Settings / Speed ---
         self.settings_frame = ctk.CTkFrame(self)
         self.settings_frame.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
@@ -162,9 +186,32 @@ class App(ctk.CTk):
         # Apply loaded settings to manager
         self.hotkey_manager.update_hotkeys(self.settings['hotkeys'])
 
+        # Scheduled playback shares the main player
+        self.scheduler = Scheduler(
+            self.player, self.recordings_dir, os.path.join(self.data_dir, "schedule.json"),
+            on_job_start=lambda job: self.after(0, self._on_scheduled_start, job),
+            on_job_finished=lambda job: self.on_playback_finished(),
+            is_busy=lambda: self.app_state == "RECORDING")
+        self.scheduler.start()
+
         # Initial scan
         self.refresh_file_list()
 
+        # Live stats are pulled from the backend snapshots on a fixed timer
+        self.after(STATS_POLL_MS, self.poll_stats)
+
+    def poll_stats(self):
+        if self.app_state == "RECORDING":
+            stats = self.recorder.get_stats()
+            self.event_count_label.configure(text=f"Events: {stats.events} | {stats.elapsed:.1f}s")
+        elif self.app_state == "PLAYING":
+            display = format_playback(self.player.get_stats())
+            if display:
+                fraction, text = display
+                self.progress_bar.set(fraction)
+                self.event_count_label.configure(text=text)
+        self.after(STATS_POLL_MS, self.poll_stats)
+
     def load_settings(self):
         if os.path.exists(self.settings_file):
             try:
@@ -175,6 +222,8 @@ class App(ctk.CTk):
                         self.settings["speed"] = float(data["speed"])
                     if "hotkeys" in data:
                         self.settings["hotkeys"].update(data["hotkeys"])
+                    if "playlist" in data:
+                        self.settings["playlist"] = [dict(PLAYLIST_DEFAULTS, **item) for item in data["playlist"]]
             except Exception as e:
                 print(f"Error loading settings: {e}")
 
@@ -191,6 +240,9 @@ class App(ctk.CTk):
         self.settings['speed'] = value
         
     def refresh_file_list(self):
+        # Keep the search index in step with the directory without blocking the UI
+        self.indexer.refresh_async()
+
         if not os.path.exists(self.recordings_dir):
              self.file_option_menu.configure(values=["No .rsmk files found"])
              return
@@ -243,6 +295,7 @@ class App(ctk.CTk):
             self.btn_play.configure(state="normal")
             self.btn_save.configure(state="normal")
             self.file_option_menu.configure(state="normal")
+            self.scheduler.wake()
             
         elif self.app_state == "PLAYING":
             self.player.stop_playback()
@@ -251,28 +304,75 @@ class App(ctk.CTk):
             self.btn_record.configure(state="normal")
             self.file_option_menu.configure(state="normal")
 
-    def start_playback(self):
+    def start_playback(self, start_index=0):
         if self.app_state != "IDLE" or not self.current_events:
             if not self.current_events:
                 messagebox.showwarning("Warning", "No recording loaded/recorded.")
             return
             
+        events = events_from(self.current_events, start_index) if start_index else self.current_events
         speed = self.speed_slider.get()
         self.app_state = "PLAYING"
         self.status_label.configure(text=f"Status: Playing ({int(speed*100)}%)", text_color="#2ecc71")
         self.btn_record.configure(state="disabled")
         self.file_option_menu.configure(state="disabled")
+        self.progress_bar.set(0)
         
-        self.player.start_playback(self.current_events, speed_factor=speed, on_finished=self.on_playback_finished)
+        self.player.start_playback(events, speed_factor=speed, on_finished=self.on_playback_finished)
+
+    def start_playlist(self):
+        playlist = self.settings["playlist"]
+        if self.app_state != "IDLE" or not playlist:
+            if not playlist:
+                messagebox.showwarning("Warning", "Playlist is empty.")
+            return
+
+        entries = [{
+            "source": os.path.join(self.recordings_dir, item["filename"]),
+            "repeat": item["repeat"],
+            "speed": item["speed"],
+            "gap": item["gap"]
+        } for item in playlist]
+
+        self.app_state = "PLAYING"
+        self.status_label.configure(text=f"Status: Playing Playlist ({len(entries)} entries)", text_color="#2ecc71")
+        self.btn_record.configure(state="disabled")
+        self.file_option_menu.configure(state="disabled")
+        self.progress_bar.set(0)
+
+        self.player.start_playlist(entries, FileHandler.load_recording, on_finished=self.on_playback_finished)
 
     def on_playback_finished(self):
         self.after(0, self._on_playback_finished_main)
         
     def _on_playback_finished_main(self):
+        if self.app_state == "RECORDING":
+            # A scheduled run cut short by a recording; leave the recording alone
+            self.scheduler.wake()
+            return
+
         self.app_state = "IDLE"
         self.status_label.configure(text="Status: Playback Finished", text_color="white")
+        self.progress_bar.set(1 if self.player.get_stats().total else 0)
+        self.event_count_label.configure(text=f"Events: {len(self.current_events)}")
         self.btn_record.configure(state="normal")
         self.file_option_menu.configure(state="normal")
+        self.scheduler.wake()
+
+    def _on_scheduled_start(self, job):
+        if self.app_state == "RECORDING":
+            # Record was pressed after the scheduler had already started the
+            # player; stop it so nothing is typed into the recording
+            self.player.stop_playback()
+            return
+        if self.app_state != "IDLE":
+            return
+
+        self.app_state = "PLAYING"
+        self.status_label.configure(text=f"Status: Scheduled ({job['filename']})", text_color="#2ecc71")
+        self.btn_record.configure(state="disabled")
+        self.file_option_menu.configure(state="disabled")
+        self.progress_bar.set(0)
 
     def save_file(self):
         if not self.current_events:
@@ -297,6 +397,192 @@ class App(ctk.CTk):
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save: {e}")
 
+    def open_search(self):
+        self.indexer.refresh_async()
+
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Search Recordings")
+        dialog.geometry("500x400")
+        dialog.attributes("-topmost", True)
+        dialog.grid_columnconfigure(0, weight=1)
+        dialog.grid_rowconfigure(1, weight=1)
+
+        entry = ctk.CTkEntry(dialog, placeholder_text="Text typed in a recording...")
+        entry.grid(row=0, column=0, sticky="ew", padx=10, pady=10)
+
+        results_frame = ctk.CTkScrollableFrame(dialog)
+        results_frame.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=10, pady=(0, 10))
+
+        def open_match(match):
+            self.file_option_menu.set(match["filename"])
+            self.on_file_selected(match["filename"])
+            self.status_label.configure(text=f"Match in {match['filename']} at {match['time']:.2f}s (event {match['event_index']})", text_color="white")
+            dialog.destroy()
+
+        def play_match(match):
+            open_match(match)
+            if self.filename == match["filename"]:
+                self.start_playback(start_index=match["event_index"])
+
+        def run_search(event=None):
+            for child in results_frame.winfo_children():
+                child.destroy()
+            matches = self.indexer.search(entry.get())
+            if not matches:
+                text = "No matches yet, still indexing recordings..." if self.indexer.is_refreshing else "No matches"
+                ctk.CTkLabel(results_frame, text=text).pack(pady=5)
+                return
+            for match in matches:
+                text = f"{match['filename']} @ {match['time']:.2f}s: ...{match['context']}..."
+                row = ctk.CTkFrame(results_frame, fg_color="transparent")
+                row.pack(fill="x", pady=2)
+                btn = ctk.CTkButton(row, text=text, anchor="w", fg_color="transparent", border_width=1,
+                                    command=lambda m=match: open_match(m))
+                btn.pack(side="left", fill="x", expand=True)
+                btn_play = ctk.CTkButton(row, text="Play", width=50, fg_color="#2ecc71", hover_color="#27ae60",
+                                         command=lambda m=match: play_match(m))
+                btn_play.pack(side="right", padx=(5, 0))
+
+        entry.bind("<Return>", run_search)
+        btn_go = ctk.CTkButton(dialog, text="Search", width=80, command=run_search)
+        btn_go.grid(row=0, column=1, padx=10, pady=10)
+        entry.focus()
+
+    def open_playlist(self):
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Playlist")
+        dialog.geometry("560x420")
+        dialog.attributes("-topmost", True)
+        dialog.grid_columnconfigure(0, weight=1)
+        dialog.grid_rowconfigure(0, weight=1)
+
+        entries_frame = ctk.CTkScrollableFrame(dialog)
+        entries_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+        def refresh_entries():
+            for child in entries_frame.winfo_children():
+                child.destroy()
+            playlist = self.settings["playlist"]
+            if not playlist:
+                ctk.CTkLabel(entries_frame, text="Playlist is empty").pack(pady=5)
+            for index, item in enumerate(playlist):
+                row = ctk.CTkFrame(entries_frame, fg_color="transparent")
+                row.pack(fill="x", pady=2)
+                text = f"{index + 1}. {item['filename']} x{item['repeat']} @ {int(item['speed']*100)}%, gap {item['gap']:g}s"
+                ctk.CTkLabel(row, text=text, anchor="w").pack(side="left", fill="x", expand=True)
+                ctk.CTkButton(row, text="Remove", width=70, command=lambda i=index: remove_entry(i)).pack(side="right")
+
+        def remove_entry(index):
+            del self.settings["playlist"][index]
+            self.save_settings()
+            refresh_entries()
+
+        add_frame = ctk.CTkFrame(dialog)
+        add_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 10))
+
+        files = [f for f in os.listdir(self.recordings_dir) if f.endswith('.rsmk')] if os.path.exists(self.recordings_dir) else []
+        file_menu = ctk.CTkOptionMenu(add_frame, values=files or ["No .rsmk files found"], width=150)
+        file_menu.grid(row=0, column=0, padx=5, pady=5)
+        repeat_entry = ctk.CTkEntry(add_frame, placeholder_text="Repeat (1)", width=80)
+        repeat_entry.grid(row=0, column=1, padx=5, pady=5)
+        speed_entry = ctk.CTkEntry(add_frame, placeholder_text="Speed (1.0)", width=80)
+        speed_entry.grid(row=0, column=2, padx=5, pady=5)
+        gap_entry = ctk.CTkEntry(add_frame, placeholder_text="Gap s (0)", width=80)
+        gap_entry.grid(row=0, column=3, padx=5, pady=5)
+
+        def add_entry():
+            if not files:
+                return
+            try:
+                item = {
+                    "filename": file_menu.get(),
+                    "repeat": max(1, int(repeat_entry.get() or 1)),
+                    "speed": max(0.1, float(speed_entry.get() or 1.0)),
+                    "gap": max(0.0, float(gap_entry.get() or 0.0))
+                }
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid playlist entry: {e}", parent=dialog)
+                return
+            self.settings["playlist"].append(item)
+            self.save_settings()
+            refresh_entries()
+
+        btn_add = ctk.CTkButton(add_frame, text="Add", width=60, command=add_entry)
+        btn_add.grid(row=0, column=4, padx=5, pady=5)
+
+        def play():
+            dialog.destroy()
+            self.start_playlist()
+
+        btn_play = ctk.CTkButton(dialog, text="Play Playlist", command=play, fg_color="#2ecc71", hover_color="#27ae60")
+        btn_play.grid(row=2, column=0, pady=(0, 10))
+
+        refresh_entries()
+
+    def open_schedules(self):
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Scheduled Playback")
+        dialog.geometry("560x420")
+        dialog.attributes("-topmost", True)
+        dialog.grid_columnconfigure(0, weight=1)
+        dialog.grid_rowconfigure(0, weight=1)
+
+        jobs_frame = ctk.CTkScrollableFrame(dialog)
+        jobs_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+        def refresh_jobs():
+            for child in jobs_frame.winfo_children():
+                child.destroy()
+            jobs = self.scheduler.get_jobs()
+            if not jobs:
+                ctk.CTkLabel(jobs_frame, text="No scheduled recordings").pack(pady=5)
+            for job, next_run in jobs:
+                when = f"every {job['interval']:g}s" if job['kind'] == 'interval' else f"daily at {job['at']}"
+                next_text = time.strftime("%H:%M:%S", time.localtime(next_run)) if next_run else "-"
+                row = ctk.CTkFrame(jobs_frame, fg_color="transparent")
+                row.pack(fill="x", pady=2)
+                ctk.CTkLabel(row, text=f"{job['filename']} - {when} ({job['policy']}), next {next_text}", anchor="w").pack(side="left", fill="x", expand=True)
+                ctk.CTkButton(row, text="Remove", width=70, command=lambda job_id=job['id']: remove_job(job_id)).pack(side="right")
+
+        def remove_job(job_id):
+            self.scheduler.remove_job(job_id)
+            refresh_jobs()
+
+        add_frame = ctk.CTkFrame(dialog)
+        add_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 10))
+
+        files = [f for f in os.listdir(self.recordings_dir) if f.endswith('.rsmk')] if os.path.exists(self.recordings_dir) else []
+        file_menu = ctk.CTkOptionMenu(add_frame, values=files or ["No .rsmk files found"], width=150)
+        file_menu.grid(row=0, column=0, padx=5, pady=5)
+        kind_menu = ctk.CTkOptionMenu(add_frame, values=["interval", "daily"], width=90)
+        kind_menu.grid(row=0, column=1, padx=5, pady=5)
+        value_entry = ctk.CTkEntry(add_frame, placeholder_text="300 or 09:00", width=100)
+        value_entry.grid(row=0, column=2, padx=5, pady=5)
+        policy_menu = ctk.CTkOptionMenu(add_frame, values=list(POLICIES), width=90)
+        policy_menu.grid(row=0, column=3, padx=5, pady=5)
+
+        def add_job():
+            if not files:
+                return
+            value = value_entry.get().strip()
+            try:
+                if kind_menu.get() == 'interval':
+                    self.scheduler.add_job(file_menu.get(), 'interval', interval=float(value),
+                                           speed=self.speed_slider.get(), policy=policy_menu.get())
+                else:
+                    self.scheduler.add_job(file_menu.get(), 'daily', at=value,
+                                           speed=self.speed_slider.get(), policy=policy_menu.get())
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid schedule: {e}", parent=dialog)
+                return
+            value_entry.delete(0, "end")
+            refresh_jobs()
+
+        btn_add = ctk.CTkButton(add_frame, text="Add", width=60, command=add_job)
+        btn_add.grid(row=0, column=4, padx=5, pady=5)
+
+        refresh_jobs()
+
     def open_hotkey_config(self):
         dialog = ctk.CTkToplevel(self)
         dialog.title("Configure Hotkeys")
@@ -345,6 +631,7 @@ class App(ctk.CTk):
         self.save_settings()
         
         self.hotkey_manager.stop_listening()
+        self.scheduler.stop()
         self.destroy()
         sys.exit(0)
 
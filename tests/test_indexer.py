@@ -0,0 +1,153 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from backend.file_handler import FileHandler
+from backend.indexer import RecordingIndexer
+
+
+def press(char=None, key=None, time=0.0):
+    return {'action': 'press', 'time': time, 'key_char': char, 'key_code': key, 'vk': None}
+
+
+def release(char=None, key=None, time=0.0):
+    return {'action': 'release', 'time': time, 'key_char': char, 'key_code': key, 'vk': None}
+
+
+def typed(text):
+    """Events for typing text, one press/release pair per character."""
+    events = []
+    for i, char in enumerate(text):
+        events.append(press(char, time=i * 0.1))
+        events.append(release(char, time=i * 0.1 + 0.05))
+    return events
+
+
+def text_of(events):
+    return RecordingIndexer.reconstruct_text(events)[0]
+
+
+@pytest.fixture
+def library(tmp_path):
+    recordings = tmp_path / "recordings"
+    recordings.mkdir()
+
+    def save(name, events):
+        FileHandler.save_recording(str(recordings / name), events)
+        return str(recordings / name)
+
+    def indexer():
+        ix = RecordingIndexer(str(recordings), str(tmp_path / "index.json"))
+        ix.refresh()
+        return ix
+
+    return save, indexer
+
+
+def test_shift_and_caps_lock():
+    events = [press(key='Key.shift'), press('h'), release(key='Key.shift'), press('i'),
+              press(key='Key.caps_lock'), press('a'), press(key='Key.caps_lock'), press('b'),
+              press(key='Key.caps_lock'), press(key='Key.shift_r'), press('c')]
+    assert text_of(events) == 'HiAbc'
+
+
+def test_backspace_and_special_keys():
+    events = typed('helo') + [press(key='Key.backspace'), press('l'), press('o'),
+                              press(key='Key.space'), press(key='Key.enter'), press(key='Key.tab'),
+                              press(key='Key.left')]
+    assert text_of(events) == 'hello \n\t'
+
+
+def test_shortcuts_are_not_text():
+    events = [press('a'), press(key='Key.ctrl_l'), press('c'), release(key='Key.ctrl_l'),
+              press(key='Key.alt'), press('f'), release(key='Key.alt'),
+              press(key='Key.cmd'), press('v'), release(key='Key.cmd'), press('b')]
+    assert text_of(events) == 'ab'
+
+
+def test_altgr_characters_are_kept():
+    events = [press('a'), press(key='Key.alt_gr'), press('@'), release(key='Key.alt_gr'),
+              # Windows reports AltGr as ctrl plus alt
+              press(key='Key.ctrl_l'), press(key='Key.alt_r'), press('€'),
+              release(key='Key.alt_r'), release(key='Key.ctrl_l'), press('b')]
+    assert text_of(events) == 'a@€b'
+
+
+def test_positions_point_at_the_typing_event():
+    events = [press(key='Key.shift', time=0.0), press('x', time=0.5), release(key='Key.shift', time=0.6),
+              press('y', time=1.0)]
+    text, times, indices = RecordingIndexer.reconstruct_text(events)
+    assert text == 'Xy'
+    assert times == [0.5, 1.0]
+    assert indices == [1, 3]
+
+
+def test_search_substring_and_case(library):
+    save, indexer = library
+    save("greeting.rsmk", typed('Hello World'))
+    save("other.rsmk", typed('nothing here'))
+    ix = indexer()
+
+    matches = ix.search('WORLD')
+    assert [(m["filename"], m["offset"], m["event_index"]) for m in matches] == [("greeting.rsmk", 6, 12)]
+    assert matches[0]["time"] == pytest.approx(0.6)
+    assert ix.search('planet') == []
+
+
+def test_search_shorter_than_ngram(library):
+    save, indexer = library
+    save("a.rsmk", typed('abcab'))
+    ix = indexer()
+
+    assert [m["offset"] for m in ix.search('ab')] == [0, 3]
+    assert [m["offset"] for m in ix.search('c')] == [2]
+
+
+def test_search_non_ascii_keeps_offsets(library):
+    save, indexer = library
+    save("city.rsmk", typed('İstanbul abc'))
+    save("short.rsmk", typed('İa'))
+    ix = indexer()
+
+    matches = {m["filename"]: m for m in ix.search('abc')}
+    assert matches["city.rsmk"]["offset"] == 9
+    assert matches["city.rsmk"]["event_index"] == 18
+
+    short = [m for m in ix.search('a') if m["filename"] == "short.rsmk"]
+    assert [m["event_index"] for m in short] == [2]
+
+
+def test_incremental_refresh(library):
+    save, indexer = library
+    path = save("macro.rsmk", typed('first version'))
+    save("keep.rsmk", typed('unchanged'))
+    ix = indexer()
+    assert ix.search('first')
+
+    save("macro.rsmk", typed('second version'))
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert ix.refresh()
+    assert ix.search('first') == []
+    assert [m["filename"] for m in ix.search('second')] == ["macro.rsmk"]
+    assert [m["filename"] for m in ix.search('unchanged')] == ["keep.rsmk"]
+
+    # Nothing changed since the last pass
+    assert not ix.refresh()
+
+    os.remove(path)
+    assert ix.refresh()
+    assert ix.search('version') == []
+
+
+def test_index_persists(library):
+    save, indexer = library
+    save("a.rsmk", typed('persisted text'))
+    indexer()
+
+    reloaded = indexer()
+    assert not reloaded.refresh()
+    assert [m["filename"] for m in reloaded.search('persist')] == ["a.rsmk"]
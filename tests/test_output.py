@@ -0,0 +1,93 @@
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from backend.output import OutputBackend, MemoryBackend, StreamBackend, fidelity_report
+from backend.player import Player
+
+
+def event(action, t, char):
+    return {'action': action, 'time': t, 'key_char': char, 'key_code': None, 'vk': None}
+
+
+def test_report_exact_playback():
+    source = [event('press', 0.0, 'a'), event('release', 0.1, 'a'), event('press', 0.2, 'b')]
+    injected = [(0.001, source[0]), (0.099, source[1]), (0.203, source[2])]
+    report = fidelity_report(source, injected)
+
+    assert report["in_order"]
+    assert report["first_mismatch"] is None
+    assert report["missing"] == 0 and report["extra"] == 0
+    assert report["max_error"] == pytest.approx(0.003)
+    assert report["mean_error"] == pytest.approx(0.005 / 3)
+    assert report["mean_lateness"] == pytest.approx(0.001)
+
+
+def test_report_matches_by_occurrence_after_a_drop():
+    source = [event('press', 0.0, 'a'), event('press', 0.1, 'b'),
+              event('press', 0.2, 'a'), event('release', 0.3, 'a')]
+    # The press of b was lost; the rest arrived on time
+    injected = [(0.0, source[0]), (0.2, source[2]), (0.3, source[3])]
+    report = fidelity_report(source, injected)
+
+    assert not report["in_order"]
+    assert report["first_mismatch"] == 1
+    # Later events still pair with their own source events, not the one before
+    assert report["missing"] == 1
+    assert report["extra"] == 0
+    assert report["max_error"] == pytest.approx(0.0)
+
+
+def test_report_counts_extra_events_and_scales_by_speed():
+    source = [event('press', 0.0, 'a'), event('press', 1.0, 'b')]
+    injected = [(0.0, source[0]), (0.5, source[1]), (0.6, event('press', 0.0, 'z'))]
+    report = fidelity_report(source, injected, speed_factor=2.0)
+
+    assert report["extra"] == 1
+    assert report["missing"] == 0
+    assert report["first_mismatch"] == 2
+    assert report["max_error"] == pytest.approx(0.0)
+
+
+def test_cleanup_releases_are_kept_separate():
+    source = [event('press', 0.0, 'a'), event('release', 2.0, 'a')]
+    backend = MemoryBackend()
+    player = Player(backend)
+    player.start_playback(source)
+    time.sleep(0.05)
+    player.stop_playback()
+    player.thread.join(timeout=5)
+
+    assert [e['action'] for _, e in backend.get_injected()] == ['press']
+    assert [e['action'] for _, e in backend.get_cleanup()] == ['release']
+    report = fidelity_report(source, backend.get_injected())
+    assert report["missing"] == 1
+    assert not report["in_order"]
+
+
+def test_stream_backend_writes_json_lines():
+    stream = io.StringIO()
+    backend = StreamBackend(stream)
+    backend.begin()
+    backend.send([event('press', 0.0, 'a'), event('release', 0.0, 'a')])
+    backend.send_cleanup([event('release', 0.0, 'b')])
+    backend.end()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(r['action'], r['key_char']) for r in records] == [('press', 'a'), ('release', 'a'), ('release', 'b')]
+    assert all('sent_at' in r for r in records)
+    assert [r.get('cleanup', False) for r in records] == [False, False, True]
+
+
+def test_backend_without_send_cannot_be_created():
+    class Incomplete(OutputBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
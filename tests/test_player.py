@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from backend.output import MemoryBackend, StreamBackend
+from backend.player import Player, BATCH_WINDOW, prepare_events, events_from
+
+
+def event(action, t, char=None, key=None):
+    return {'action': action, 'time': t, 'key_char': char, 'key_code': key, 'vk': None}
+
+
+def play(player, events, speed_factor=1.0):
+    player.start_playback(events, speed_factor=speed_factor)
+    player.thread.join(timeout=5)
+    assert not player.is_playing
+
+
+def test_prepare_events_batches_within_window():
+    events = [event('press', 0.0, 'a'),
+              event('press', BATCH_WINDOW / 2, 'b'),
+              event('release', BATCH_WINDOW, 'a'),
+              event('release', BATCH_WINDOW * 3, 'b')]
+    batches = prepare_events(events)
+
+    assert [offset for offset, _ in batches] == [0.0, BATCH_WINDOW * 3]
+    assert [len(batch) for _, batch in batches] == [3, 1]
+
+
+def test_prepare_events_window_applies_after_speed():
+    events = [event('press', 0.0, 'a'), event('release', 0.01, 'a')]
+    assert len(prepare_events(events, 1.0)) == 2
+    # At 10x the 10ms gap shrinks to 1ms, inside the window
+    assert len(prepare_events(events, 10.0)) == 1
+
+
+def test_player_sends_batches_in_order():
+    events = [event('press', 0.0, 'a'), event('release', 0.0005, 'a'),
+              event('press', 0.05, 'b'), event('release', 0.0505, 'b')]
+    backend = MemoryBackend()
+    play(Player(backend), events)
+
+    assert backend.batches == 2
+    assert [e for _, e in backend.get_injected()] == events
+    assert backend.get_injected()[2][0] == pytest.approx(0.05, abs=0.02)
+
+
+def test_events_from_presses_held_keys_and_rebases():
+    events = [event('press', 1.0, key='Key.shift'),
+              event('press', 1.5, 'H'), event('release', 1.6, 'H'),
+              event('press', 2.0, 'I'), event('release', 2.1, 'I'),
+              event('release', 2.5, key='Key.shift')]
+    sliced = events_from(events, 3)
+
+    assert sliced[0] == dict(events[0], time=0.0)
+    assert [(e['action'], e['key_char'] or e['key_code'], e['time']) for e in sliced[1:]] == [
+        ('press', 'I', 0.0),
+        ('release', 'I', pytest.approx(0.1)),
+        ('release', 'Key.shift', pytest.approx(0.5)),
+    ]
+
+
+def test_events_from_start_returns_copy():
+    events = [event('press', 0.2, 'a')]
+    assert events_from(events, 0) == events
+
+
+def test_failed_begin_still_finishes():
+    finished = threading.Event()
+    player = Player(StreamBackend(os.path.join(os.devnull, "missing", "out.jsonl")))
+    player.start_playback([event('press', 0.0, 'a')], on_finished=finished.set)
+
+    assert finished.wait(timeout=5)
+    player.thread.join(timeout=5)
+    assert not player.is_playing
+
+
+def test_start_playback_refuses_while_playing():
+    player = Player(MemoryBackend())
+    assert player.start_playback([event('press', 0.0, 'a'), event('press', 5.0, 'b')])
+    assert not player.start_playback([event('press', 0.0, 'c')])
+    player.stop_playback()
+    player.thread.join(timeout=5)
+
+
+
+def make_loader(recordings, backend, calls):
+    """Stub loader that records when each source was requested."""
+    def loader(source):
+        calls.append((source, len(backend.get_injected())))
+        if source not in recordings:
+            raise FileNotFoundError(source)
+        return recordings[source]
+    return loader
+
+
+def play_playlist(player, entries, loader):
+    finished = threading.Event()
+    assert player.start_playlist(entries, loader, on_finished=finished.set)
+    assert finished.wait(timeout=5)
+    player.thread.join(timeout=5)
+
+
+def test_playlist_timing_repeats_gaps_and_speed():
+    recordings = {
+        "a": [event('press', 0.0, 'a'), event('release', 0.05, 'a')],
+        "b": [event('press', 0.0, 'b'), event('release', 0.1, 'b')],
+    }
+    backend = MemoryBackend()
+    player = Player(backend)
+    play_playlist(player, [
+        {'source': "a", 'repeat': 2, 'gap': 0.1},
+        {'source': "b", 'speed': 2.0},
+    ], make_loader(recordings, backend, []))
+
+    injected = backend.get_injected()
+    assert [(e['action'], e['key_char']) for _, e in injected] == [
+        ('press', 'a'), ('release', 'a'), ('press', 'a'), ('release', 'a'),
+        ('press', 'b'), ('release', 'b')]
+    # Each run of "a" lasts 0.05s and is followed by a 0.1s gap; "b" at 2x lasts 0.05s
+    expected = [0.0, 0.05, 0.15, 0.2, 0.3, 0.35]
+    assert [t for t, _ in injected] == [pytest.approx(t, abs=0.02) for t in expected]
+    assert player.get_stats().runs == 3
+    assert player.get_stats().run == 2
+
+
+def test_playlist_prefetches_next_entry():
+    recordings = {
+        "a": [event('press', 0.0, 'a'), event('release', 0.2, 'a')],
+        "b": [event('press', 0.0, 'b')],
+    }
+    backend = MemoryBackend()
+    calls = []
+    play_playlist(Player(backend), [{'source': "a"}, {'source': "b"}],
+                  make_loader(recordings, backend, calls))
+
+    # "b" was loaded while "a" was still playing, before its release went out
+    assert [source for source, _ in calls] == ["a", "b"]
+    assert calls[1][1] < len(recordings["a"])
+
+
+def test_playlist_skips_entry_that_fails_to_load():
+    recordings = {
+        "a": [event('press', 0.0, 'a')],
+        "c": [event('press', 0.0, 'c')],
+    }
+    backend = MemoryBackend()
+    play_playlist(Player(backend), [
+        {'source': "a", 'gap': 0.05},
+        {'source': "missing", 'repeat': 3, 'gap': 1.0},
+        {'source': "c"},
+    ], make_loader(recordings, backend, []))
+
+    injected = backend.get_injected()
+    assert [e['key_char'] for _, e in injected] == ['a', 'c']
+    # The failed entry's repeats and gap are not played
+    assert injected[1][0] == pytest.approx(0.05, abs=0.02)
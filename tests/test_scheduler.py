@@ -0,0 +1,240 @@
+import datetime
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from backend import scheduler as scheduler_module
+from backend.file_handler import FileHandler
+from backend.output import MemoryBackend
+from backend.player import Player
+from backend.scheduler import Scheduler
+
+START = 1_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_events(char, last_time=0.0):
+    events = [{'action': 'press', 'time': 0.0, 'key_char': char, 'key_code': None, 'vk': None}]
+    events.append({'action': 'release', 'time': last_time, 'key_char': char, 'key_code': None, 'vk': None})
+    return events
+
+
+def wait_idle(player):
+    if player.thread:
+        player.thread.join(timeout=5)
+    assert not player.is_playing
+
+
+def played_chars(backend):
+    return [event['key_char'] for _, event in backend.get_injected() if event['action'] == 'press']
+
+
+@pytest.fixture
+def setup(tmp_path):
+    FileHandler.save_recording(str(tmp_path / "a.rsmk"), make_events('a'))
+    FileHandler.save_recording(str(tmp_path / "b.rsmk"), make_events('b'))
+    clock = FakeClock()
+    backend = MemoryBackend()
+    player = Player(backend)
+    sched = Scheduler(player, str(tmp_path), str(tmp_path / "schedule.json"), clock=clock)
+    sched.start(threaded=False)
+    return sched, clock, player, backend
+
+
+def test_interval_job_fires_when_due(setup):
+    sched, clock, player, backend = setup
+    sched.add_job("a.rsmk", interval=10)
+
+    clock.now = START + 9
+    sched.tick()
+    assert not player.is_playing
+
+    clock.now = START + 10
+    sched.tick()
+    wait_idle(player)
+    assert played_chars(backend) == ['a']
+
+
+def test_interval_realigns_to_grid_after_missed_runs(setup):
+    sched, clock, player, backend = setup
+    job = sched.add_job("a.rsmk", interval=10)
+    assert sched.next_runs[job["id"]] == START + 10
+
+    # Woke up late, three slots were missed
+    clock.now = START + 35
+    sched.tick()
+    wait_idle(player)
+    assert sched.next_runs[job["id"]] == START + 40
+    assert played_chars(backend) == ['a']
+
+
+def test_daily_job_next_run(tmp_path):
+    sched = Scheduler(None, str(tmp_path), str(tmp_path / "schedule.json"))
+    noon = datetime.datetime(2026, 1, 1, 12, 0).timestamp()
+    job = {"id": "x", "kind": "daily", "at": "09:00"}
+    assert sched._compute_next_run(job, noon) == datetime.datetime(2026, 1, 2, 9, 0).timestamp()
+    job["at"] = "13:30"
+    assert sched._compute_next_run(job, noon) == datetime.datetime(2026, 1, 1, 13, 30).timestamp()
+
+
+def test_removed_job_entries_are_discarded(setup):
+    sched, clock, player, backend = setup
+    job = sched.add_job("a.rsmk", interval=10)
+    sched.remove_job(job["id"])
+
+    clock.now = START + 100
+    sched.tick()
+    assert not player.is_playing
+    assert backend.get_injected() == []
+    assert sched.heap == []
+
+
+def test_skip_policy_drops_job_while_busy(setup):
+    sched, clock, player, backend = setup
+    sched.add_job("b.rsmk", interval=10, policy='skip')
+    player.start_playback(make_events('x', last_time=30))
+
+    clock.now = START + 10
+    sched.tick()
+    assert len(sched.pending) == 0
+
+    player.stop_playback()
+    wait_idle(player)
+    sched.tick()
+    assert played_chars(backend) == ['x']
+
+
+def test_queue_policy_runs_job_after_current_playback(setup):
+    sched, clock, player, backend = setup
+    sched.add_job("b.rsmk", interval=10, policy='queue')
+    player.start_playback(make_events('x', last_time=30))
+
+    clock.now = START + 10
+    sched.tick()
+    assert [job["filename"] for job, _ in sched.pending] == ["b.rsmk"]
+
+    player.stop_playback()
+    wait_idle(player)
+    sched.tick()
+    wait_idle(player)
+    assert played_chars(backend) == ['b']
+    assert len(sched.pending) == 0
+
+
+def test_removed_job_leaves_the_queue(setup):
+    sched, clock, player, backend = setup
+    job = sched.add_job("b.rsmk", interval=10, policy='queue')
+    player.start_playback(make_events('x', last_time=30))
+
+    clock.now = START + 10
+    sched.tick()
+    assert len(sched.pending) == 1
+    sched.remove_job(job["id"])
+    assert len(sched.pending) == 0
+
+    player.stop_playback()
+    wait_idle(player)
+    sched.tick()
+    assert not player.is_playing
+    assert played_chars(backend) == ['x']
+
+
+def test_preempt_policy_stops_current_playback(setup):
+    sched, clock, player, backend = setup
+    sched.add_job("b.rsmk", interval=10, policy='preempt')
+    player.start_playback(make_events('x', last_time=30))
+
+    clock.now = START + 10
+    sched.tick()
+    # The scheduler does not wait for the player to stop
+    wait_idle(player)
+    sched.tick()
+    wait_idle(player)
+    assert played_chars(backend) == ['b']
+
+
+def test_recording_is_cached_until_file_changes(setup, tmp_path, monkeypatch):
+    sched, clock, player, backend = setup
+    loads = []
+    original = FileHandler.load_recording
+
+    def counting_load(filepath):
+        loads.append(filepath)
+        return original(filepath)
+
+    monkeypatch.setattr(scheduler_module.FileHandler, "load_recording", staticmethod(counting_load))
+    sched.add_job("a.rsmk", interval=1)
+
+    for step in range(1, 4):
+        clock.now = START + step
+        sched.tick()
+        wait_idle(player)
+    assert len(loads) == 1
+
+    path = str(tmp_path / "a.rsmk")
+    os.utime(path, (os.path.getmtime(path) + 10, os.path.getmtime(path) + 10))
+    clock.now = START + 4
+    sched.tick()
+    wait_idle(player)
+    assert len(loads) == 2
+
+
+def test_invalid_saved_jobs_are_skipped(tmp_path, capsys):
+    good = {"id": "good", "filename": "a.rsmk", "kind": "interval", "interval": "60", "policy": "queue"}
+    bad = [
+        {"id": "at", "filename": "a.rsmk", "kind": "daily", "at": "9am"},
+        {"id": "kind", "filename": "a.rsmk", "at": "09:00"},
+        {"id": "interval", "filename": "a.rsmk", "kind": "interval", "interval": -5},
+        {"filename": "a.rsmk", "kind": "interval", "interval": 60},
+        "not a job",
+    ]
+    with open(tmp_path / "schedule.json", 'w') as f:
+        json.dump({"version": "1.0", "jobs": [good] + bad}, f)
+
+    sched = Scheduler(None, str(tmp_path), str(tmp_path / "schedule.json"), clock=FakeClock())
+    assert list(sched.jobs) == ["good"]
+    assert sched.jobs["good"]["interval"] == 60.0
+    assert capsys.readouterr().out.count("Skipping invalid scheduled job") == len(bad)
+
+    sched.start(threaded=False)
+    assert sched.next_runs["good"] == START + 60
+
+
+def test_scheduling_error_does_not_stop_other_jobs(setup, capsys):
+    sched, clock, player, backend = setup
+    broken = sched.add_job("a.rsmk", interval=10)
+    sched.add_job("b.rsmk", interval=20)
+    # Corrupted after validation, e.g. edited in memory
+    broken["kind"] = 'daily'
+    broken["at"] = 'never'
+
+    clock.now = START + 10
+    sched.tick()
+    wait_idle(player)
+    assert "Error scheduling a.rsmk" in capsys.readouterr().out
+    assert broken["id"] not in sched.next_runs
+
+    clock.now = START + 20
+    sched.tick()
+    wait_idle(player)
+    assert played_chars(backend) == ['b']
+
+
+def test_schedule_persists(setup, tmp_path):
+    sched, clock, player, backend = setup
+    job = sched.add_job("a.rsmk", kind='daily', at='09:00', policy='skip')
+
+    reloaded = Scheduler(player, str(tmp_path), str(tmp_path / "schedule.json"))
+    assert reloaded.jobs[job["id"]]["policy"] == 'skip'
+    assert reloaded.jobs[job["id"]]["at"] == '09:00'